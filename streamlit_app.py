@@ -1,12 +1,17 @@
 #######################
 # Import libraries
 
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+import pyarrow as pa
+import pyarrow.feather as feather
 
 #######################
 # Page configuration
@@ -67,6 +72,7 @@ REGION_MAP_REV = {v: k for k, v in REGION_MAP.items()}
 
 #######################
 # 변수 코드 → 라벨 매핑
+GENDER_MAP = {1: "남", 2: "여"}
 AGE_MAP = {
     1:"0~14세", 2:"15~19세", 3:"20~24세", 4:"25~29세", 5:"30~34세",
     6:"35~39세", 7:"40~44세", 8:"45~49세", 9:"50세 이상", 99:"미상"
@@ -77,34 +83,204 @@ MOTHER_TOTAL_CHILD_MAP = {
     1:"1명", 2:"2명", 3:"3명", 4:"4명", 5:"5명", 6:"6명", 7:"7명", 8:"8명 이상", 99:"미상"
 }
 NATIONALITY_MAP = {1:"출생한국인", 2:"귀화한국인", 3:"외국", 9:"미상"}
+MARITAL_MAP = {1: "혼인 중 출생", 2: "혼인 외 출생"}
+# 결혼중외의자녀여부코드 원본 문자 코드 → 정수 코드 (Y=혼인 중, N=혼인 외, 9=미상)
+MARITAL_CODE_MAP = {"Y": 1, "N": 2, "9": 9}
+
+#######################
+# 라벨 컬럼 category dtype (반복되는 문자열을 정수 코드로 저장)
+AGE_ORDER = list(AGE_MAP.values())
+LABEL_DTYPES = {
+    "시도명": pd.CategoricalDtype(categories=list(REGION_MAP.values())),
+    "성별": pd.CategoricalDtype(categories=list(GENDER_MAP.values())),
+    "부연령_라벨": pd.CategoricalDtype(categories=AGE_ORDER, ordered=True),
+    "모연령_라벨": pd.CategoricalDtype(categories=AGE_ORDER, ordered=True),
+    "다태아출산순위": pd.CategoricalDtype(categories=list(MULTI_ORDER_MAP.values())),
+    "다태아분류": pd.CategoricalDtype(categories=list(MULTI_TYPE_MAP.values())),
+    "모총출생아수": pd.CategoricalDtype(categories=list(MOTHER_TOTAL_CHILD_MAP.values())),
+    "부_국적구분": pd.CategoricalDtype(categories=list(NATIONALITY_MAP.values())),
+    "모_국적구분": pd.CategoricalDtype(categories=list(NATIONALITY_MAP.values())),
+}
+
+#######################
+# 본문 패널에서 읽는 컬럼만 필터 결과로 내보냄 (필요한 컬럼만 materialize)
+VIEW_COLUMNS = [
+    "연도", "출생자주소지_행정구역시도코드", "성별코드", "출생월", "다태아분류코드",
+    "결혼중외의자녀여부코드", "출생아체중", "임신주수", "부모동거기간",
+] + list(LABEL_DTYPES)
+
+#######################
+# 코드 컬럼 dtype (PyArrow 백엔드로 읽을 때 값 범위에 맞는 최소 폭으로 지정)
+CODE_DTYPES = {
+    "연도": "int16[pyarrow]",
+    "출생자주소지_행정구역시도코드": "int8[pyarrow]",
+    "성별코드": "int8[pyarrow]",
+    "출생월": "int8[pyarrow]",
+    "다태아분류코드": "int8[pyarrow]",
+    "다태아출산순위코드": "int8[pyarrow]",
+    "부모동거기간": "int16[pyarrow]",
+    "부연령_5세단위코드": "int8[pyarrow]",
+    "모연령_5세단위코드": "int8[pyarrow]",
+    "모총출생아수코드": "int8[pyarrow]",
+    "부_국적구분코드": "int8[pyarrow]",
+    "모_국적구분코드": "int8[pyarrow]",
+    "출생아체중": "float32[pyarrow]",
+}
 
 #######################
 # Load data  (인코딩 이슈 안전 처리)
-@st.cache_data
 def load_data(path: str) -> pd.DataFrame:
     encodings = ["cp949", "euc-kr", "utf-8-sig", "utf-8", "ISO-8859-1"]
     for enc in encodings:
         try:
-            return pd.read_csv(path, encoding=enc)
+            return pd.read_csv(path, encoding=enc, engine="pyarrow", dtype_backend="pyarrow", dtype=CODE_DTYPES)
         except UnicodeDecodeError:
             continue
-    return pd.read_csv(path, encoding="cp949", encoding_errors="ignore")
+    return pd.read_csv(path, encoding="cp949", encoding_errors="ignore", dtype_backend="pyarrow", dtype=CODE_DTYPES)
+
+#######################
+# 코드 → 라벨 컬럼 추가 (원본 코드에서만 파생되므로 로드 직후 1회만 계산)
+def enrich(df: pd.DataFrame) -> pd.DataFrame:
+    # 부모동거기간 미상(999) 행은 모든 분석에서 제외하므로 로드 시 한 번만 걸러냄 (결측 행은 유지)
+    keep = df["부모동거기간"].to_numpy(dtype=np.int16, na_value=0) != 999
+    df = df.loc[keep].reset_index(drop=True)
+    # 문자 코드(Y/N/9) 컬럼은 여기서 한 번만 정수 코드로 매핑
+    df["결혼중외의자녀여부코드"] = (
+        df["결혼중외의자녀여부코드"].astype(str).map(MARITAL_CODE_MAP).astype("int8[pyarrow]")
+    )
+
+    df["시도명"] = df["출생자주소지_행정구역시도코드"].map(REGION_MAP)
+    df["성별"] = df["성별코드"].map(GENDER_MAP)
+
+    df["부연령_라벨"] = df["부연령_5세단위코드"].map(AGE_MAP)
+    df["모연령_라벨"] = df["모연령_5세단위코드"].map(AGE_MAP)
 
-df_reshaped = load_data("chd_2023.csv")
+    df["다태아출산순위"] = df["다태아출산순위코드"].map(MULTI_ORDER_MAP)
+    df["다태아분류"] = df["다태아분류코드"].map(MULTI_TYPE_MAP)
+    df["모총출생아수"] = df["모총출생아수코드"].map(MOTHER_TOTAL_CHILD_MAP)
+    df["부_국적구분"] = df["부_국적구분코드"].map(NATIONALITY_MAP)
+    df["모_국적구분"] = df["모_국적구분코드"].map(NATIONALITY_MAP)
+    return df.astype(LABEL_DTYPES)
 
 #######################
-# Plotly 공통 레이아웃(다크/투명 배경) 헬퍼
+# Feather(Arrow IPC) 캐시: CSV보다 새 파일이 있으면 바로 읽고, 없으면 CSV에서 만들어 저장
+# load_data/enrich/dtype 정의가 바뀌어 캐시 내용이 달라지면 버전을 올려 새 파일로 다시 생성
+FEATHER_CACHE_VERSION = 3
+
+@st.cache_data
+def load_dataset(csv_path: str, feather_path: str) -> pd.DataFrame:
+    if os.path.exists(feather_path) and os.path.getmtime(feather_path) >= os.path.getmtime(csv_path):
+        try:
+            # dictionary 컬럼은 pandas category로, 나머지는 Arrow dtype 그대로 변환
+            return feather.read_table(feather_path).to_pandas(
+                types_mapper=lambda t: None if pa.types.is_dictionary(t) else pd.ArrowDtype(t)
+            )
+        except (pa.ArrowInvalid, OSError):
+            pass  # 손상된(쓰다 만) 캐시는 무시하고 아래에서 CSV로 다시 생성
+    df = enrich(load_data(csv_path))
+    # 같은 디렉터리의 임시 파일에 다 쓴 뒤 교체 → 중간에 끊겨도 불완전한 캐시가 남지 않음
+    tmp_path = f"{feather_path}.{os.getpid()}.tmp"
+    try:
+        df.to_feather(tmp_path, compression="zstd")
+        os.replace(tmp_path, feather_path)
+    except OSError:
+        # 읽기 전용 환경에서는 캐시 파일 없이 진행
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+df_reshaped = load_dataset("chd_2023.csv", f"chd_2023.v{FEATHER_CACHE_VERSION}.feather")
+
+#######################
+# 필터 옵션/전체 범위 (사이드바 위젯과 compute_filtered가 같은 값을 사용)
+NA_CHECK_COLUMNS = ["연도", "출생자주소지_행정구역시도코드", "성별코드", "출생월", "출생아체중"]
+PRESENT_REGION_NAMES = [
+    REGION_MAP[c] for c in sorted(df_reshaped["출생자주소지_행정구역시도코드"].dropna().unique().tolist())
+    if c in REGION_MAP
+]
+WT_MIN, WT_MAX = float(df_reshaped["출생아체중"].min()), float(df_reshaped["출생아체중"].max())
+WT_RANGE = (round(max(WT_MIN, 0.0), 2), round(WT_MAX, 2))
+# 결측/매핑 밖 코드가 없고 슬라이더 전체 범위가 모든 체중을 포함하면 전체 선택 필터는 모든 행을 통과시킴
+FULL_SELECTION_KEEPS_ALL = bool(
+    not df_reshaped[NA_CHECK_COLUMNS].isna().any().any()
+    and set(df_reshaped["출생자주소지_행정구역시도코드"].unique().tolist()) <= set(REGION_MAP)
+    and set(df_reshaped["성별코드"].unique().tolist()) <= set(GENDER_MAP)
+    and set(df_reshaped["출생월"].unique().tolist()) <= set(range(1, 13))
+    and np.float32(WT_RANGE[0]) <= np.float32(WT_MIN)
+    and np.float32(WT_RANGE[1]) >= np.float32(WT_MAX)
+)
+
+#######################
+# 필터 적용 (동일한 필터 상태는 캐시에서 바로 반환)
+@st.cache_data(show_spinner=False)
+def compute_filtered(year, regions, genders, months_sel, multiple, marital, wt_range, exclude_na):
+    # 모든 항목이 전체 선택(또는 빈 선택)이면 마스크를 만들지 않고 컬럼만 선택해 반환
+    if (
+        FULL_SELECTION_KEEPS_ALL
+        and year == "전체" and multiple == "전체" and marital == "전체"
+        and (not regions or set(regions) == set(PRESENT_REGION_NAMES))
+        and (not genders or set(genders) == set(GENDER_MAP.values()))
+        and (not months_sel or set(months_sel) == set(range(1, 13)))
+        and tuple(wt_range) == WT_RANGE
+    ):
+        return df_reshaped[VIEW_COLUMNS]
+
+    # 모든 조건을 하나의 boolean mask로 결합한 뒤 한 번만 인덱싱
+    m = np.ones(len(df_reshaped), dtype=bool)
+    # 코드 컬럼은 결측을 0(어떤 코드와도 겹치지 않음)으로 채운 고정폭 정수 배열로 꺼내 비교
+    # → object 배열/nullable 마스크를 거치지 않고, 결측 행은 비교에서 자연히 제외됨
+
+    if year != "전체":
+        m &= df_reshaped["연도"].to_numpy(dtype=np.int16, na_value=0) == int(year)
+
+    if regions:
+        selected_codes = np.array([REGION_MAP_REV[n] for n in regions if n in REGION_MAP_REV], dtype=np.int8)
+        m &= np.isin(df_reshaped["출생자주소지_행정구역시도코드"].to_numpy(dtype=np.int8, na_value=0), selected_codes)
+
+    if genders:
+        rev_gender = {v: k for k, v in GENDER_MAP.items()}
+        m &= np.isin(df_reshaped["성별코드"].to_numpy(dtype=np.int8, na_value=0), np.array([rev_gender[g] for g in genders], dtype=np.int8))
+
+    if months_sel:
+        m &= np.isin(df_reshaped["출생월"].to_numpy(dtype=np.int8, na_value=0), np.array(months_sel, dtype=np.int8))
+
+    if multiple != "전체":
+        rev_multiple = {v: k for k, v in MULTI_TYPE_MAP.items()}
+        m &= df_reshaped["다태아분류코드"].to_numpy(dtype=np.int8, na_value=0) == rev_multiple[multiple]
+
+    if marital != "전체":
+        rev_marital = {v: k for k, v in MARITAL_MAP.items()}
+        m &= df_reshaped["결혼중외의자녀여부코드"].to_numpy(dtype=np.int8, na_value=0) == rev_marital[marital]
+
+    # 체중 필터 (float32 배열과 같은 정밀도로 경계 비교, NaN은 비교 결과 False로 제외)
+    w = df_reshaped["출생아체중"].to_numpy(dtype=np.float32, na_value=np.nan)
+    m &= (w >= np.float32(wt_range[0])) & (w <= np.float32(wt_range[1]))
+
+    # 결측치 제거 옵션
+    if exclude_na:
+        m &= df_reshaped[NA_CHECK_COLUMNS].notna().all(axis=1).to_numpy()
+
+    # 행 선택 결과는 이미 새 프레임이고 이후 쓰기가 없으므로 추가 복사하지 않음
+    return df_reshaped.loc[m, VIEW_COLUMNS]
+
+#######################
+# Plotly 공통 레이아웃(다크/투명 배경) 템플릿 — 모듈 로드 시 1회 등록
+_dark_axis = dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", zeroline=False, linecolor="rgba(255,255,255,0.15)")
+pio.templates["dark_compact"] = go.layout.Template(layout=dict(
+    paper_bgcolor="rgba(0,0,0,0)",
+    plot_bgcolor="rgba(0,0,0,0)",
+    font=dict(color="#e6e6e6"),
+    xaxis=_dark_axis,
+    yaxis=_dark_axis,
+))
+
 def apply_dark_layout(fig: go.Figure, title=None):
+    # 스타일은 템플릿이 담당하고, 제목 유무에 따른 여백/제목만 한 번에 지정
     fig.update_layout(
-        template="plotly_dark",
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(color="#e6e6e6"),
+        template="plotly_dark+dark_compact",
         margin=dict(l=10, r=10, t=50 if title else 30, b=10),
         title=dict(text=title, x=0.02, xanchor="left") if title else None,
     )
-    fig.update_xaxes(showgrid=True, gridcolor="rgba(255,255,255,0.08)", zeroline=False, linecolor="rgba(255,255,255,0.15)")
-    fig.update_yaxes(showgrid=True, gridcolor="rgba(255,255,255,0.08)", zeroline=False, linecolor="rgba(255,255,255,0.15)")
     return fig
 
 #######################
@@ -113,104 +289,74 @@ with st.sidebar:
     st.header("출생 통계 대시보드")
     st.caption("필터 선택에 따라 본문 시각화가 업데이트됩니다.")
 
-    def to_int_series(s, dropna=True):
-        x = pd.to_numeric(s, errors="coerce").astype("Int64")
-        return x.dropna().astype(int) if dropna else x
-
     # 옵션
-    years = sorted(to_int_series(df_reshaped["연도"]).unique().tolist())
-    present_codes = sorted(to_int_series(df_reshaped["출생자주소지_행정구역시도코드"]).unique().tolist())
-    present_names = [REGION_MAP[c] for c in present_codes if c in REGION_MAP]
+    years = sorted(df_reshaped["연도"].dropna().unique().tolist())
     months = list(range(1, 13))
 
     # 위젯
     selected_year = st.selectbox("연도 선택", options=["전체"] + years, index=0)
 
     selected_regions_name = st.multiselect(
-        "시도 선택 (다중)", options=present_names, default=present_names, help="출생자 주소지 시도 기준"
+        "시도 선택 (다중)", options=PRESENT_REGION_NAMES, default=PRESENT_REGION_NAMES, help="출생자 주소지 시도 기준"
     )
 
-    gender_map = {1: "남", 2: "여"}
-    selected_genders = st.multiselect("성별", options=list(gender_map.values()), default=list(gender_map.values()))
+    selected_genders = st.multiselect("성별", options=list(GENDER_MAP.values()), default=list(GENDER_MAP.values()))
     selected_months = st.multiselect("출생월", options=months, default=months)
 
-    multiple_map = MULTI_TYPE_MAP.copy()
-    selected_multiple = st.selectbox("다태아 분류", options=["전체"] + list(multiple_map.values()), index=0)
-
-    marital_map = {1: "혼인 중 출생", 2: "혼인 외 출생"}
-    selected_marital = st.selectbox("혼인 상태(출생 유형)", options=["전체"] + list(marital_map.values()), index=0)
+    selected_multiple = st.selectbox("다태아 분류", options=["전체"] + list(MULTI_TYPE_MAP.values()), index=0)
+    selected_marital = st.selectbox("혼인 상태(출생 유형)", options=["전체"] + list(MARITAL_MAP.values()), index=0)
 
-    wt = pd.to_numeric(df_reshaped["출생아체중"], errors="coerce")
-    wt_min, wt_max = float(wt.min()), float(wt.max())
     selected_wt = st.slider("출생 체중(kg) 범위",
-        min_value=round(max(wt_min, 0.0), 2), max_value=round(wt_max, 2),
-        value=(round(max(wt_min, 0.0), 2), round(wt_max, 2)), step=0.05)
+        min_value=WT_RANGE[0], max_value=WT_RANGE[1], value=WT_RANGE, step=0.05)
 
     viz_theme = st.selectbox("시각화 컬러 스케일",
         options=["blues", "viridis", "plasma", "magma", "inferno", "greys"], index=0)
     exclude_na = st.checkbox("결측치 제외", value=True)
 
-    # 필터 적용
-    _df = df_reshaped.copy()
-
-    if selected_year != "전체":
-        _df = _df[to_int_series(_df["연도"], dropna=False) == int(selected_year)]
-
-    if selected_regions_name:
-        selected_codes = [REGION_MAP_REV[n] for n in selected_regions_name if n in REGION_MAP_REV]
-        _df = _df[to_int_series(_df["출생자주소지_행정구역시도코드"], dropna=False).isin(selected_codes)]
-
-    if selected_genders:
-        rev_gender = {v: k for k, v in gender_map.items()}
-        _df = _df[to_int_series(_df["성별코드"], dropna=False).isin([rev_gender[g] for g in selected_genders])]
-
-    if selected_months:
-        _df = _df[to_int_series(_df["출생월"], dropna=False).isin(selected_months)]
-
-    if selected_multiple != "전체":
-        rev_multiple = {v: k for k, v in multiple_map.items()}
-        _df = _df[to_int_series(_df["다태아분류코드"], dropna=False) == rev_multiple[selected_multiple]]
-
-    if selected_marital != "전체":
-        rev_marital = {v: k for k, v in marital_map.items()}
-        _df = _df[to_int_series(_df["결혼중외의자녀여부코드"], dropna=False) == rev_marital[selected_marital]]
-
-    # 체중 필터
-    _df["출생아체중"] = pd.to_numeric(_df["출생아체중"], errors="coerce")
-    _df = _df[_df["출생아체중"].between(selected_wt[0], selected_wt[1], inclusive="both")]
-
-    # 결측치 제거 옵션
-    if exclude_na:
-        _df = _df.dropna(subset=["연도","출생자주소지_행정구역시도코드","성별코드","출생월","출생아체중"])
-
-    # ✅ 부모동거기간 999(미상) 제외
-    if "부모동거기간" in _df.columns:
-        _df["부모동거기간"] = pd.to_numeric(_df["부모동거기간"], errors="coerce")
-        _df = _df[_df["부모동거기간"] != 999]
-
-    # ===== 코드 → 라벨 컬럼 추가 =====
-    _df["시도코드_int"] = to_int_series(_df["출생자주소지_행정구역시도코드"], dropna=False)
-    _df["시도명"] = _df["시도코드_int"].map(REGION_MAP)
-
-    _df["부연령코드_int"] = to_int_series(_df["부연령_5세단위코드"], dropna=False)
-    _df["모연령코드_int"] = to_int_series(_df["모연령_5세단위코드"], dropna=False)
-    _df["부연령_라벨"] = _df["부연령코드_int"].map(AGE_MAP)
-    _df["모연령_라벨"] = _df["모연령코드_int"].map(AGE_MAP)
-
-    _df["다태아출산순위"] = to_int_series(_df["다태아출산순위코드"], dropna=False).map(MULTI_ORDER_MAP)
-    _df["다태아분류"] = to_int_series(_df["다태아분류코드"], dropna=False).map(MULTI_TYPE_MAP)
-    _df["모총출생아수"] = to_int_series(_df["모총출생아수코드"], dropna=False).map(MOTHER_TOTAL_CHILD_MAP)
-    _df["부_국적구분"] = to_int_series(_df["부_국적구분코드"], dropna=False).map(NATIONALITY_MAP)
-    _df["모_국적구분"] = to_int_series(_df["모_국적구분코드"], dropna=False).map(NATIONALITY_MAP)
-
-    st.session_state["filtered_df"] = _df
+    filter_key = (
+        selected_year, tuple(sorted(selected_regions_name)), tuple(sorted(selected_genders)),
+        tuple(sorted(selected_months)), selected_multiple, selected_marital, selected_wt, exclude_na,
+    )
+    # 필터 상태가 그대로면(테마 변경 등) 이전 결과를 재사용해 필터 코드를 건너뜀
+    if st.session_state.get("filter_key") == filter_key and "filtered_df" in st.session_state:
+        _df = st.session_state["filtered_df"]
+    else:
+        _df = compute_filtered(*filter_key)
+        st.session_state["filtered_df"] = _df
+        st.session_state["filter_key"] = filter_key
     st.session_state["viz_theme"] = viz_theme
 
     st.markdown("---")
     st.metric("선택된 데이터 개수", f"{len(_df):,}")
 
+#######################
+# 시도별 집계 (출생아 수/평균 체중) — 같은 필터 상태에서는 캐시 재사용
+# _df는 해싱하지 않고(밑줄 인자) filter_key로만 캐시 — 세션에 있는 필터 결과를 그대로 받음
+@st.cache_data(show_spinner=False)
+def agg_by_region(filter_key, _df: pd.DataFrame) -> pd.DataFrame:
+    # 시도코드는 작은 정수라 해싱 없이 np.bincount로 코드별 개수/체중 합계를 바로 셈
+    codes = _df["출생자주소지_행정구역시도코드"].to_numpy(dtype=np.int64, na_value=0)
+    w = _df["출생아체중"].to_numpy(dtype=np.float64, na_value=np.nan)
+    has_w = ~np.isnan(w)
+    counts = np.bincount(codes, minlength=40)
+    w_sum = np.bincount(codes[has_w], weights=w[has_w], minlength=counts.size)
+    w_cnt = np.bincount(codes[has_w], minlength=counts.size)
+    present = np.array([c for c in np.flatnonzero(counts) if c in REGION_MAP], dtype=np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_w = w_sum[present] / w_cnt[present]
+    return pd.DataFrame({
+        "시도명": [REGION_MAP[c] for c in present],
+        "출생아수": counts[present],
+        "출생아체중": mean_w,
+    })
+
 #######################
 # Dashboard Main Panel
+# 필터 결과가 0행이면 빈 집계/차트를 만들지 않고 안내만 표시한 뒤 종료
+if len(st.session_state.get("filtered_df", df_reshaped)) == 0:
+    st.info("해당 조건의 데이터가 없습니다.")
+    st.stop()
+
 col = st.columns((1.5, 4.5, 2), gap='medium')
 
 #######################
@@ -219,11 +365,15 @@ with col[0]:
     st.subheader("📌 출생 통계 요약")
     df_filtered = st.session_state.get("filtered_df", df_reshaped)
 
-    total_births = len(df_filtered)
-    avg_weight = pd.to_numeric(df_filtered["출생아체중"], errors="coerce").mean()
-    multiple_ratio = (pd.to_numeric(df_filtered["다태아분류코드"], errors="coerce").fillna(1).astype(int) > 1).mean() * 100
-    marital_code = pd.to_numeric(df_filtered["결혼중외의자녀여부코드"], errors="coerce")
-    marital_ratio = (marital_code == 2).mean() * 100  # 2=혼인 외(가정)
+    # 이미 타입이 정해진 컬럼을 NumPy 배열로 꺼내 한 번씩만 스캔
+    arr_w = df_filtered["출생아체중"].to_numpy(dtype=np.float32, na_value=np.nan)
+    arr_m = df_filtered["다태아분류코드"].to_numpy(dtype=np.int8, na_value=1)
+    arr_k = df_filtered["결혼중외의자녀여부코드"].to_numpy(dtype=np.int8, na_value=0)
+
+    total_births = arr_w.shape[0]
+    avg_weight = np.nanmean(arr_w)
+    multiple_ratio = np.mean(arr_m > 1) * 100
+    marital_ratio = np.mean(arr_k == 2) * 100  # 2=혼인 외(가정)
 
     k1, k2 = st.columns(2)
     k3, k4 = st.columns(2)
@@ -234,12 +384,10 @@ with col[0]:
 
     st.markdown("---")
 
-    # 성별 도넛
-    gender_map = {1: "남", 2: "여"}
+    # 성별 도넛 (category 컬럼이라 값이 0인 범주는 제외)
     gender_counts = (
-        pd.to_numeric(df_filtered["성별코드"], errors="coerce")
-        .map(gender_map).value_counts(dropna=False)
-        .rename_axis("성별").reset_index(name="인원").dropna(subset=["성별"])
+        df_filtered["성별"].value_counts().loc[lambda s: s > 0]
+        .rename_axis("성별").reset_index(name="인원")
     )
     fig_gender = px.pie(gender_counts, values="인원", names="성별", hole=0.5)
     fig_gender = apply_dark_layout(fig_gender, "성별 분포")
@@ -247,8 +395,8 @@ with col[0]:
 
     # 다태아 분포 (라벨 사용)
     multi_counts = (
-        df_filtered["다태아분류"].value_counts(dropna=False)
-        .rename_axis("구분").reset_index(name="인원").dropna(subset=["구분"])
+        df_filtered["다태아분류"].value_counts().loc[lambda s: s > 0]
+        .rename_axis("구분").reset_index(name="인원")
     )
     fig_multi = px.pie(multi_counts, values="인원", names="구분", hole=0.5)
     fig_multi = apply_dark_layout(fig_multi, "다태아 분포")
@@ -261,12 +409,11 @@ with col[1]:
     df_filtered = st.session_state.get("filtered_df", df_reshaped)
     theme = st.session_state.get("viz_theme", "blues")
 
+    region_agg = agg_by_region(st.session_state["filter_key"], df_filtered)
+
     # 지역별 출생아 수 (시도명)
     st.markdown("#### 지역별 출생아 분포 (시도 단위)")
-    region_counts = (
-        df_filtered.groupby("시도명").size().reset_index(name="출생아수")
-        .dropna(subset=["시도명"]).sort_values("출생아수", ascending=False)
-    )
+    region_counts = region_agg.sort_values("출생아수", ascending=False)
     fig_region = px.bar(region_counts, x="시도명", y="출생아수", color="출생아수", color_continuous_scale=theme)
     fig_region = apply_dark_layout(fig_region, "시도별 출생아 수")
     st.plotly_chart(fig_region, use_container_width=True)
@@ -275,9 +422,10 @@ with col[1]:
 
     # 월별 출생 추이
     st.markdown("#### 월별 출생 추이")
-    monthly_counts = (
-        df_filtered.groupby("출생월").size().reset_index(name="출생아수").sort_values("출생월")
-    )
+    # 출생월(1~12)별 개수를 np.bincount로 집계 (결측은 0번 칸에 모이므로 제외), 데이터가 있는 월만 표시
+    month_counts = np.bincount(df_filtered["출생월"].to_numpy(dtype=np.int64, na_value=0), minlength=13)
+    present_months = np.flatnonzero(month_counts[1:]) + 1
+    monthly_counts = pd.DataFrame({"출생월": present_months, "출생아수": month_counts[present_months]})
     fig_month = px.line(monthly_counts, x="출생월", y="출생아수", markers=True)
     fig_month = apply_dark_layout(fig_month, "월별 출생아 수 추이")
     st.plotly_chart(fig_month, use_container_width=True)
@@ -287,16 +435,18 @@ with col[1]:
     # 부모 연령대 히트맵 (라벨 축)
     st.markdown("#### 부모 연령대별 출생 분포")
     age_heatmap = (
-        df_filtered.groupby(["부연령_라벨", "모연령_라벨"]).size().reset_index(name="출생아수")
-        .dropna(subset=["부연령_라벨","모연령_라벨"])
+        df_filtered.groupby(["부연령_라벨", "모연령_라벨"], observed=True).size().reset_index(name="출생아수")
     )
-    age_order = ["0~14세","15~19세","20~24세","25~29세","30~34세","35~39세","40~44세","45~49세","50세 이상","미상"]
-    age_heatmap["부연령_라벨"] = pd.Categorical(age_heatmap["부연령_라벨"], categories=age_order, ordered=True)
-    age_heatmap["모연령_라벨"] = pd.Categorical(age_heatmap["모연령_라벨"], categories=age_order, ordered=True)
-
-    fig_heat = px.density_heatmap(
-        age_heatmap, x="부연령_라벨", y="모연령_라벨", z="출생아수", color_continuous_scale=theme
+    # 이미 집계된 값을 연령 순서의 행렬로 펼쳐 그대로 전달 (Plotly 내부 재집계 생략)
+    pivot = (
+        age_heatmap.pivot(index="모연령_라벨", columns="부연령_라벨", values="출생아수")
+        .reindex(index=AGE_ORDER, columns=AGE_ORDER)
+        .dropna(how="all").dropna(axis=1, how="all")
     )
+    fig_heat = go.Figure(go.Heatmap(
+        z=pivot.to_numpy(), x=pivot.columns.tolist(), y=pivot.index.tolist(),
+        colorscale=theme, colorbar=dict(title="출생아수"),
+    ))
     fig_heat = apply_dark_layout(fig_heat, "부모 연령대별 출생 분포")
     fig_heat.update_traces(hovertemplate="부연령 %{x}<br>모연령 %{y}<br>출생아수 %{z}<extra></extra>")
     st.plotly_chart(fig_heat, use_container_width=True)
@@ -308,11 +458,10 @@ with col[2]:
     df_filtered = st.session_state.get("filtered_df", df_reshaped)
     theme = st.session_state.get("viz_theme", "blues")
 
+    region_agg = agg_by_region(st.session_state["filter_key"], df_filtered)
+
     st.markdown("#### 출생아 수 Top 10 지역")
-    top_regions = (
-        df_filtered.groupby("시도명").size().reset_index(name="출생아수")
-        .dropna(subset=["시도명"]).sort_values("출생아수", ascending=False).head(10)
-    )
+    top_regions = region_agg.nlargest(10, "출생아수")
     fig_top = px.bar(top_regions, x="출생아수", y="시도명", orientation="h",
                      color="출생아수", color_continuous_scale=theme)
     fig_top = apply_dark_layout(fig_top, "출생아 수 상위 10개 지역")
@@ -321,10 +470,7 @@ with col[2]:
     st.markdown("---")
 
     st.markdown("#### 지역별 평균 출생 체중")
-    region_weight = (
-        df_filtered.dropna(subset=["시도명"]).groupby("시도명")["출생아체중"]
-        .mean().reset_index().sort_values("출생아체중", ascending=False)
-    )
+    region_weight = region_agg.sort_values("출생아체중", ascending=False)
     fig_w = px.bar(region_weight, x="시도명", y="출생아체중",
                    color="출생아체중", color_continuous_scale=theme)
     fig_w = apply_dark_layout(fig_w, "지역별 평균 출생 체중(kg)")
@@ -334,18 +480,12 @@ with col[2]:
 
     st.markdown("#### 주요 인사이트")
     c1, c2 = st.columns(2)
+    # 두 컬럼 모두 VIEW_COLUMNS에 포함되어 필터 결과에 항상 존재
     with c1:
-        if "임신주수" in df_filtered.columns:
-            st.metric("평균 임신 주수", f"{pd.to_numeric(df_filtered['임신주수'], errors='coerce').mean():.1f} 주")
-        else:
-            st.metric("평균 임신 주수", "데이터 없음")
+        st.metric("평균 임신 주수", f"{pd.to_numeric(df_filtered['임신주수'], errors='coerce').mean():.1f} 주")
     with c2:
-        # 평균 계산 시 혹시 남아있을지 모를 999 방어적으로 재제거
-        if "부모동거기간" in df_filtered.columns:
-            pdk = pd.to_numeric(df_filtered["부모동거기간"], errors="coerce").replace(999, pd.NA)
-            st.metric("평균 부모 동거기간", f"{pdk.dropna().mean():.1f} 년")
-        else:
-            st.metric("평균 부모 동거기간", "데이터 없음")
+        # 미상(999) 행은 로드 시 이미 제외됨
+        st.metric("평균 부모 동거기간", f"{df_filtered['부모동거기간'].mean():.1f} 년")
 
     st.markdown("---")
     st.markdown("#### ℹ️ 데이터 설명")